@@ -1,16 +1,28 @@
 
 import os
-import json
 import logging
 import base64
+import functools
+import shutil
+import time
 from io import BytesIO
-from typing import Tuple
+from typing import Dict, List, Tuple, Union
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+import orjson
 import msal
 from openpyxl import load_workbook
+from openpyxl.cell.read_only import ReadOnlyCell, EMPTY_CELL
+from openpyxl.formula.tokenizer import Tokenizer, Token, TokenizerError
+from openpyxl.styles.cell_style import StyleArray
 from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.xml.constants import SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
 import re
 
 # ----------------------------
@@ -25,13 +37,30 @@ CLIENT_SECRET = os.getenv("CLIENT_SECRET")
 AUTHORITY = f"https://login.microsoftonline.com/{TENANT_ID}" if TENANT_ID else None
 SCOPES = ["https://graph.microsoft.com/.default"]
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+SIMPLE_UPLOAD_MAX = 4 * 1024 * 1024  # límite de PUT simple en Graph
+UPLOAD_CHUNK_SIZE = 10 * 1024 * 1024  # múltiplo de 320 KiB, requerido por upload sessions
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON de Flask (get_json/jsonify) con orjson en lugar de json de la stdlib."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Sesión HTTP compartida: reutiliza conexiones keep-alive (evita TLS handshake por llamada)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 # ----------------------------
 # MSAL / Token helpers
 # ----------------------------
 _msal_app = None
+_token_cache = (None, 0.0)  # (access_token, expires_at epoch)
 
 def _get_msal_app():
     global _msal_app
@@ -47,6 +76,10 @@ def _get_msal_app():
 
 
 def get_graph_token() -> str:
+    global _token_cache
+    cached_token, expires_at = _token_cache
+    if cached_token and time.time() < expires_at - 60:
+        return cached_token
     app_msal = _get_msal_app()
     result = app_msal.acquire_token_silent(SCOPES, account=None)
     if not result:
@@ -54,6 +87,7 @@ def get_graph_token() -> str:
     if "access_token" not in result:
         logger.error(f"Error obteniendo token Graph: {result}")
         raise RuntimeError("No se pudo obtener token de Graph")
+    _token_cache = (result["access_token"], time.time() + int(result.get("expires_in", 0)))
     return result["access_token"]
 
 # ----------------------------
@@ -69,34 +103,90 @@ def resolve_share_to_item(url: str, token: str) -> Tuple[str, str]:
     """Devuelve (drive_id, item_id) a partir de un sharing/webUrl de OneDrive/SharePoint."""
     encoded = encode_sharing_url(url)
     headers = {"Authorization": f"Bearer {token}"}
-    r = requests.get(f"{GRAPH_BASE}/shares/{encoded}/driveItem", headers=headers)
+    r = SESSION.get(f"{GRAPH_BASE}/shares/{encoded}/driveItem", headers=headers)
     if r.status_code != 200:
         logger.error(f"Resolve share fallo ({r.status_code}): {r.text}")
         raise RuntimeError("No se pudo resolver el enlace compartido (shares/driveItem)")
-    data = r.json()
+    return _drive_item_ref(r.json())
+
+def _drive_item_ref(data: dict) -> Tuple[str, str]:
     drive_id = data.get("parentReference", {}).get("driveId")
     item_id = data.get("id")
     if not drive_id or not item_id:
         raise RuntimeError("Faltan driveId/itemId en la respuesta de driveItem")
     return drive_id, item_id
 
-def download_item_content(drive_id: str, item_id: str, token: str) -> bytes:
+def batch_resolve(urls: List[str], token: str) -> List[Tuple[str, str]]:
+    """Resuelve varios sharing URLs en una sola llamada a Graph $batch (máx. 20)."""
+    payload = {"requests": [
+        {"id": str(i), "method": "GET", "url": f"/shares/{encode_sharing_url(u)}/driveItem"}
+        for i, u in enumerate(urls)
+    ]}
+    headers = {"Authorization": f"Bearer {token}"}
+    r = SESSION.post(f"{GRAPH_BASE}/$batch", headers=headers, json=payload)
+    if r.status_code != 200:
+        logger.error(f"Batch resolve fallo ({r.status_code}): {r.text}")
+        raise RuntimeError("No se pudo resolver los enlaces compartidos ($batch)")
+    # Las respuestas del batch no vienen necesariamente en orden
+    responses = {resp.get("id"): resp for resp in r.json().get("responses", [])}
+    refs = []
+    for i in range(len(urls)):
+        resp = responses.get(str(i), {})
+        if resp.get("status") != 200:
+            logger.error(f"Resolve share fallo ({resp.get('status')}): {resp.get('body')}")
+            raise RuntimeError("No se pudo resolver el enlace compartido (shares/driveItem)")
+        refs.append(_drive_item_ref(resp.get("body") or {}))
+    return refs
+
+def download_item_content(drive_id: str, item_id: str, token: str) -> BytesIO:
+    """Descarga en streaming a un buffer (sin copia intermedia en bytes), posicionado al inicio."""
     headers = {"Authorization": f"Bearer {token}"}
     url = f"{GRAPH_BASE}/drives/{drive_id}/items/{item_id}/content"
-    r = requests.get(url, headers=headers)
-    if r.status_code not in (200, 302):
-        logger.error(f"Descarga fallo ({r.status_code}): {r.text}")
-        raise RuntimeError("No se pudo descargar el contenido del archivo")
-    return r.content
-
-def upload_item_content(drive_id: str, item_id: str, content: bytes, token: str) -> None:
+    with SESSION.get(url, headers=headers, stream=True) as r:
+        if r.status_code not in (200, 302):
+            logger.error(f"Descarga fallo ({r.status_code}): {r.text}")
+            raise RuntimeError("No se pudo descargar el contenido del archivo")
+        r.raw.decode_content = True
+        buf = BytesIO()
+        shutil.copyfileobj(r.raw, buf, length=64 * 1024)
+    buf.seek(0)
+    return buf
+
+def upload_item_content(drive_id: str, item_id: str, content: Union[bytes, memoryview], token: str) -> None:
+    """Sobrescribe el archivo; acepta un memoryview (p.ej. BytesIO.getbuffer()) sin copiarlo."""
+    if len(content) > SIMPLE_UPLOAD_MAX:
+        upload_large(drive_id, item_id, content, token)
+        return
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/octet-stream"}
     url = f"{GRAPH_BASE}/drives/{drive_id}/items/{item_id}/content"
-    r = requests.put(url, headers=headers, data=content)
+    r = SESSION.put(url, headers=headers, data=content)
     if r.status_code not in (200, 201):
         logger.error(f"Upload fallo ({r.status_code}): {r.text}")
         raise RuntimeError("No se pudo subir (sobrescribir) el archivo destino")
 
+def upload_large(drive_id: str, item_id: str, content: Union[bytes, memoryview], token: str) -> None:
+    """Sube por upload session en fragmentos (para archivos > 4 MB)."""
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"{GRAPH_BASE}/drives/{drive_id}/items/{item_id}/createUploadSession"
+    body = {"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+    r = SESSION.post(url, headers=headers, json=body)
+    if r.status_code != 200:
+        logger.error(f"createUploadSession fallo ({r.status_code}): {r.text}")
+        raise RuntimeError("No se pudo crear la sesión de subida del archivo destino")
+    upload_url = r.json()["uploadUrl"]
+
+    # Graph exige fragmentos en orden; uploadUrl ya va autenticada (sin Authorization)
+    view = memoryview(content)
+    total = len(view)
+    for start in range(0, total, UPLOAD_CHUNK_SIZE):
+        end = min(start + UPLOAD_CHUNK_SIZE, total) - 1
+        chunk_headers = {"Content-Range": f"bytes {start}-{end}/{total}"}
+        r = SESSION.put(upload_url, headers=chunk_headers, data=view[start:end + 1])
+        if r.status_code not in (200, 201, 202):
+            logger.error(f"Upload fragmento fallo ({r.status_code}): {r.text}")
+            SESSION.delete(upload_url)
+            raise RuntimeError("No se pudo subir (sobrescribir) el archivo destino")
+
 # ----------------------------
 # Excel helpers: anchor search, formula shifting, copy range
 # ----------------------------
@@ -105,110 +195,202 @@ def normalize_text(s: str) -> str:
 
 def find_anchor_row(ws, col_letter: str, search_text: str) -> int:
     target = normalize_text(search_text)
-    col_idx = column_index_from_string(col_letter)
-    for r in range(1, ws.max_row + 1):
-        cell = ws.cell(row=r, column=col_idx)
-        if normalize_text(cell.value) == target:
-            return r
     # Fallback: C por si cambió el merge
-    if col_letter.upper() != "C":
-        col_idx = column_index_from_string("C")
-        for r in range(1, ws.max_row + 1):
-            cell = ws.cell(row=r, column=col_idx)
-            if normalize_text(cell.value) == target:
+    cols = [col_letter] if col_letter.upper() == "C" else [col_letter, "C"]
+    for letter in cols:
+        col_idx = column_index_from_string(letter)
+        rows = ws.iter_rows(min_col=col_idx, max_col=col_idx, values_only=True)
+        for r, (val,) in enumerate(rows, start=1):
+            # Normalización en línea; solo celdas de texto (números/fechas no pueden ser el ancla)
+            if isinstance(val, str) and val and val.strip().replace(":", "").casefold() == target:
                 return r
     raise ValueError(f"No se encontró '{search_text}' en columna {col_letter} ni en C.")
 
-# Regex que soporta prefijo de hoja opcional y rangos
+def find_anchor_streaming(dst_buf: BytesIO, sheet: str, col_letter: str, search_text: str) -> int:
+    """Igual que find_anchor_row pero sobre un workbook read_only (streaming, solo valores)."""
+    dst_buf.seek(0)
+    wb = load_workbook(dst_buf, read_only=True, data_only=True)
+    try:
+        if sheet not in wb.sheetnames:
+            raise RuntimeError(f"La hoja destino '{sheet}' no existe.")
+        ws = wb[sheet]
+        # La dimensión declarada en el xlsx puede ser incorrecta: recorrer hasta el final real
+        ws.reset_dimensions()
+        return find_anchor_row(ws, col_letter, search_text)
+    finally:
+        wb.close()
+
+# Regex que soporta prefijo de hoja opcional (capturado, para conservarlo) y rangos
 _token = r"(?:'[^']+'|[A-Za-z0-9_]+)!"  # 'Hoja 1'!  o Hoja1!
-sheet_prefix = rf"(?:{_token})?"
+sheet_prefix = rf"({_token})?"
 cell_ref = r"(\$?)([A-Z]{1,3})(\$(\d+)|(\d+))"  # col_abs, col_letters, row_part, num1?, num2?
 cell_or_range = rf"{sheet_prefix}{cell_ref}(?:: {sheet_prefix}{cell_ref})?"
 cell_or_range_pattern = re.compile(cell_or_range.replace(" ", ""))
+_NO_SHIFT_RE = re.compile(r"INDIRECT|ADDRESS", re.I)
+
+# Conversiones letra<->índice de columna cacheadas (se repiten por cada referencia)
+_col_index = functools.lru_cache(maxsize=1024)(column_index_from_string)
+_col_letter = functools.lru_cache(maxsize=1024)(get_column_letter)
 
 def _shift_one(groups, drow, dcol):
     col_abs, col_letters, row_part, row_num1, row_num2 = groups
     row_abs = "$" if row_part.startswith("$") else ""
     row_number = int(row_num1 or row_num2)
-    col_idx = column_index_from_string(col_letters)
+    col_idx = _col_index(col_letters)
     new_col_idx = col_idx if col_abs == "$" else col_idx + dcol
     new_row = row_number if row_abs == "$" else row_number + drow
     new_col_idx = max(1, new_col_idx)
     new_row = max(1, new_row)
-    return f"{col_abs}{get_column_letter(new_col_idx)}{row_abs}{new_row}"
+    return f"{col_abs}{_col_letter(new_col_idx)}{row_abs}{new_row}"
+
+def _shift_match(m, drow, dcol):
+    """Reescribe un match de cell_or_range_pattern conservando los prefijos de hoja."""
+    g = m.groups()
+    left = (g[0] or "") + _shift_one(g[1:6], drow, dcol)
+    if g[7] is None:  # ref simple
+        return left
+    return f"{left}:{g[6] or ''}{_shift_one(g[7:], drow, dcol)}"
+
+def _shift_ref(ref: str, drow: int, dcol: int) -> str:
+    """Desplaza un operando A1 o A1:B2; nombres, columnas/filas completas, etc. quedan igual."""
+    m = cell_or_range_pattern.fullmatch(ref)
+    return _shift_match(m, drow, dcol) if m else ref
+
+def _shift_formula_regex(formula: str, drow: int, dcol: int) -> str:
+    """Fallback por regex para fórmulas que el tokenizer no acepta."""
+    parts = []
+    last_pos = 0
+    in_str = False
+    for m in cell_or_range_pattern.finditer(formula):
+        # Paridad de comillas acumulada: cada tramo se cuenta una sola vez (O(n) en total)
+        in_str ^= bool(formula.count('"', last_pos, m.start()) & 1)
+        parts.append(formula[last_pos:m.start()])
+        # Evitar tocar coincidencias dentro de comillas
+        parts.append(m.group(0) if in_str else _shift_match(m, drow, dcol))
+        in_str ^= bool(m.group(0).count('"') & 1)
+        last_pos = m.end()
+    parts.append(formula[last_pos:])
+    return "".join(parts)
 
 def shift_formula_refs(formula: str, drow: int = 0, dcol: int = 0) -> str:
     """Desplaza referencias en una fórmula Excel. Respeta textos "..." y no toca INDIRECT/ADDRESS."""
     if not (isinstance(formula, str) and formula.startswith("=")):
         return formula
-    up = formula.upper()
-    if "INDIRECT" in up or "ADDRESS" in up:
+    if (drow == 0 and dcol == 0) or _NO_SHIFT_RE.search(formula):
         return formula
 
-    def repl(m):
-        text = m.group(0)
-        # Evitar tocar coincidencias dentro de comillas
-        before = formula[:m.span()[0]]
-        if before.count('"') % 2 == 1:
-            return text
-        g = m.groups()
-        if len(g) == 10:  # rango: dos refs
-            left = _shift_one(g[1:6], drow, dcol)
-            right = _shift_one(g[6:], drow, dcol)
-            return f"{left}:{right}"
-        else:  # ref simple
-            return _shift_one(g, drow, dcol)
-
-    return cell_or_range_pattern.sub(repl, formula)
-
-def copy_range_adjusting(ws_src, ws_dst, src_range: str, dst_start_cell: str):
-    start, end = src_range.split(":")
-    src_start_col_letter = ''.join(filter(str.isalpha, start))
-    src_start_row = int(''.join(filter(str.isdigit, start)))
-    src_end_col_letter = ''.join(filter(str.isalpha, end))
-    src_end_row = int(''.join(filter(str.isdigit, end)))
-    src_start_col = column_index_from_string(src_start_col_letter)
-    src_end_col = column_index_from_string(src_end_col_letter)
+    # Un solo recorrido por tokens: solo se reescriben operandos de tipo rango
+    try:
+        tok = Tokenizer(formula)
+    except TokenizerError:
+        return _shift_formula_regex(formula, drow, dcol)
+    for t in tok.items:
+        if t.type == Token.OPERAND and t.subtype == Token.RANGE:
+            t.value = _shift_ref(t.value, drow, dcol)
+    return tok.render()
+
+def parse_cell(ref: str) -> Tuple[int, int]:
+    """'B12' -> (fila, columna)."""
+    return int(''.join(filter(str.isdigit, ref))), column_index_from_string(''.join(filter(str.isalpha, ref)))
+
+def parse_range(rng: str) -> Tuple[int, int, int, int]:
+    """'A1:Z25' -> (fila_ini, col_ini, fila_fin, col_fin)."""
+    start, end = rng.split(":")
+    return (*parse_cell(start), *parse_cell(end))
+
+_DEFAULT_STYLE = StyleArray()  # celdas sin estilo propio: todos los índices a 0
+_COL_TAG = f"{{{SHEET_MAIN_NS}}}col"
+_SHEET_DATA_TAG = f"{{{SHEET_MAIN_NS}}}sheetData"
+
+def _cell_style(cell) -> StyleArray:
+    """Índices de estilo de una celda origen: Cell (_style), ReadOnlyCell o EmptyCell."""
+    if isinstance(cell, ReadOnlyCell):
+        return cell.style_array
+    return getattr(cell, "_style", None) or _DEFAULT_STYLE
+
+def column_widths(ws, min_col: int, max_col: int) -> Dict[int, float]:
+    """{columna: ancho} en [min_col, max_col]. Las hojas read_only no tienen column_dimensions:
+    se lee <cols> del XML, que va antes de <sheetData>."""
+    if hasattr(ws, "column_dimensions"):
+        widths = {}
+        for col in range(min_col, max_col + 1):
+            dim = ws.column_dimensions.get(get_column_letter(col))
+            if dim and dim.width:
+                widths[col] = dim.width
+        return widths
+
+    widths = {}
+    with ws._get_source() as src:
+        for _, el in iterparse(src, events=("start",)):
+            if el.tag == _SHEET_DATA_TAG:
+                break
+            if el.tag == _COL_TAG and el.get("width"):
+                lo = max(min_col, int(el.get("min")))
+                hi = min(max_col, int(el.get("max")))
+                for col in range(lo, hi + 1):
+                    widths[col] = float(el.get("width"))
+    return widths
+
+def copy_range_adjusting(ws_src, ws_dst, src_range: str, dst_start_cell: str) -> Tuple[int, int]:
+    """Copia el rango y devuelve (filas, columnas) copiadas."""
+    src_start_row, src_start_col, src_end_row, src_end_col = parse_range(src_range)
     num_rows = src_end_row - src_start_row + 1
     num_cols = src_end_col - src_start_col + 1
 
-    dst_start_col_letter = ''.join(filter(str.isalpha, dst_start_cell))
-    dst_start_row = int(''.join(filter(str.isdigit, dst_start_cell)))
-    dst_start_col = column_index_from_string(dst_start_col_letter)
+    dst_start_row, dst_start_col = parse_cell(dst_start_cell)
 
     drow = dst_start_row - src_start_row
     dcol = dst_start_col - src_start_col
-
-    for r_off in range(num_rows):
-        for c_off in range(num_cols):
-            r_src = src_start_row + r_off
-            c_src = src_start_col + c_off
-            r_dst = dst_start_row + r_off
-            c_dst = dst_start_col + c_off
-
-            src = ws_src.cell(row=r_src, column=c_src)
-            dst = ws_dst.cell(row=r_dst, column=c_dst)
-
+    shift = drow != 0 or dcol != 0
+
+    # Objetos de estilo del workbook origen (inmutables): se asignan tal cual, sin copy()
+    wb_src = ws_src.parent
+    fonts, fills, borders, alignments = wb_src._fonts, wb_src._fills, wb_src._borders, wb_src._alignments
+
+    src_rows = ws_src.iter_rows(min_row=src_start_row, max_row=src_end_row,
+                                min_col=src_start_col, max_col=src_end_col)
+    dst_rows = ws_dst.iter_rows(min_row=dst_start_row, max_row=dst_start_row + num_rows - 1,
+                                min_col=dst_start_col, max_col=dst_start_col + num_cols - 1)
+    # Una hoja read_only deja de emitir filas al final de sus datos: se rellenan con celdas vacías
+    empty_row = (EMPTY_CELL,) * num_cols
+    for src_row, dst_row in zip_longest(src_rows, dst_rows, fillvalue=empty_row):
+        for src, dst in zip(src_row, dst_row):
             val = src.value
-            if isinstance(val, str) and val.startswith("="):
+            # La mayoría de celdas son números/None: comprobación de tipo exacta y sin startswith()
+            if shift and val.__class__ is str and val and val[0] == "=":
                 dst.value = shift_formula_refs(val, drow=drow, dcol=dcol)
             else:
                 dst.value = val
 
-            # Copiar estilos básicos
-            dst.font = src.font
-            dst.fill = src.fill
-            dst.border = src.border
-            dst.alignment = src.alignment
-            dst.number_format = src.number_format
+            # Copiar estilos básicos. src.font & co. son StyleProxy (no hashables), así que se
+            # resuelven por índice; no se copia _style porque los índices son propios de cada workbook.
+            st = _cell_style(src)
+            dst.font = fonts[st.fontId]
+            dst.fill = fills[st.fillId]
+            dst.border = borders[st.borderId]
+            dst.alignment = alignments[st.alignmentId]
+            dst.number_format = src.number_format or "General"
 
     # Copiar anchos de columna
-    for j in range(num_cols):
-        src_letter = get_column_letter(src_start_col + j)
-        dst_letter = get_column_letter(dst_start_col + j)
-        dim = ws_src.column_dimensions.get(src_letter)
-        if dim and dim.width:
-            ws_dst.column_dimensions[dst_letter].width = dim.width
+    for col, width in column_widths(ws_src, src_start_col, src_end_col).items():
+        ws_dst.column_dimensions[get_column_letter(col + dcol)].width = width
+
+    return num_rows, num_cols
+
+def open_source_sheet(drive_id: str, item_id: str, sheet: str, token: str):
+    """Descarga el origen y lo abre read_only (solo se lee); data_only=False conserva las fórmulas."""
+    wb = load_workbook(download_item_content(drive_id, item_id, token), read_only=True, data_only=False)
+    if sheet not in wb.sheetnames:
+        raise RuntimeError(f"La hoja origen '{sheet}' no existe.")
+    return wb, wb[sheet]
+
+def open_dest_sheet(drive_id: str, item_id: str, sheet: str, col_letter: str, search_text: str, token: str):
+    """Descarga el destino, busca el ancla en streaming y lo carga completo para editarlo."""
+    buf = download_item_content(drive_id, item_id, token)
+    anchor_row = find_anchor_streaming(buf, sheet, col_letter=col_letter, search_text=search_text)
+    buf.seek(0)
+    wb = load_workbook(buf, data_only=False)
+    return wb, wb[sheet], anchor_row
 
 # ----------------------------
 # Flask endpoints
@@ -221,7 +403,7 @@ def health():
 def copy_range_endpoint():
     try:
         body = request.get_json(force=True)
-        logger.info(f"Body recibido: {json.dumps(body, ensure_ascii=False)}")
+        logger.info(f"Body recibido: {orjson.dumps(body).decode()}")
 
         source_sharing_url = body["source_sharing_url"]
         source_sheet = body["source_sheet"]
@@ -234,39 +416,32 @@ def copy_range_endpoint():
 
         token = get_graph_token()
 
-        # Resolver y descargar origen
-        src_drive, src_item = resolve_share_to_item(source_sharing_url, token)
-        src_bytes = download_item_content(src_drive, src_item, token)
-        wb_src = load_workbook(BytesIO(src_bytes), data_only=False)
-        if source_sheet not in wb_src.sheetnames:
-            raise RuntimeError(f"La hoja origen '{source_sheet}' no existe.")
-        ws_src = wb_src[source_sheet]
-
-        # Resolver, descargar destino
-        dst_drive, dst_item = resolve_share_to_item(dest_sharing_url, token)
-        dst_bytes = download_item_content(dst_drive, dst_item, token)
-        wb_dst = load_workbook(BytesIO(dst_bytes), data_only=False)
-        if dest_sheet not in wb_dst.sheetnames:
-            raise RuntimeError(f"La hoja destino '{dest_sheet}' no existe.")
-        ws_dst = wb_dst[dest_sheet]
-
-        # Buscar ancla y calcular punto de pegado
-        anchor_row = find_anchor_row(ws_dst, col_letter=search_col_letter, search_text=search_text)
+        # Resolver ambos enlaces en un solo $batch
+        (src_drive, src_item), (dst_drive, dst_item) = batch_resolve(
+            [source_sharing_url, dest_sharing_url], token
+        )
+        # Cada lado descarga y parsea en su hilo: el parseo de uno se solapa con la red del otro
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            f_src = ex.submit(open_source_sheet, src_drive, src_item, source_sheet, token)
+            f_dst = ex.submit(open_dest_sheet, dst_drive, dst_item, dest_sheet,
+                              search_col_letter, search_text, token)
+            wb_src, ws_src = f_src.result()
+            wb_dst, ws_dst, anchor_row = f_dst.result()
+
+        # Calcular punto de pegado
         paste_start_row = anchor_row + offset_rows
         dst_start_cell = f"B{paste_start_row}"  # pegamos en columna B
 
         # Copiar rango ajustando fórmulas/formatos/anchos
-        copy_range_adjusting(ws_src, ws_dst, src_range=source_range, dst_start_cell=dst_start_cell)
+        rows, cols = copy_range_adjusting(ws_src, ws_dst, src_range=source_range, dst_start_cell=dst_start_cell)
+        wb_src.close()
 
-        # Guardar y subir destino
+        # Guardar y subir destino desde el mismo BytesIO: getbuffer() es una vista sin copia
+        # (sin getvalue()/read()); se libera al terminar la subida
         out = BytesIO()
         wb_dst.save(out)
-        upload_item_content(dst_drive, dst_item, out.getvalue(), token)
-
-        # Calcular filas/columnas del rango para la respuesta
-        start, end = source_range.split(":")
-        rows = int(''.join(filter(str.isdigit, end))) - int(''.join(filter(str.isdigit, start))) + 1
-        cols = column_index_from_string(''.join(filter(str.isalpha, end))) - column_index_from_string(''.join(filter(str.isalpha, start))) + 1
+        with out.getbuffer() as view:
+            upload_item_content(dst_drive, dst_item, view, token)
 
         return jsonify({
             "status": "ok",
@@ -282,6 +457,7 @@ def copy_range_endpoint():
         logger.exception("Error en /copy-range")
         return jsonify({"error": str(e)}), 500
 
+# En producción: `gunicorn app:app` (ver gunicorn.conf.py). Esto es solo para desarrollo local.
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "10000"))
     app.run(host="0.0.0.0", port=port)
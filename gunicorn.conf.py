@@ -0,0 +1,10 @@
+# Configuración de gunicorn (se carga automáticamente): gunicorn app:app
+# Workers gthread: varias /copy-range solapan su espera de I/O contra Graph.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+keepalive = 5
+timeout = 120  # libros grandes: descarga + openpyxl + subida